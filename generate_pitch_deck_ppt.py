@@ -1,8 +1,14 @@
-import json
+import asyncio
+import hashlib
+import aiohttp
+import httpx
 import openai
-import requests
+import orjson
 import os
-from openai import OpenAI
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI
+from tenacity import retry, retry_if_exception, retry_if_exception_type, stop_after_attempt, wait_exponential
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage
@@ -13,29 +19,50 @@ from PIL import Image
 from io import BytesIO
 
 # === CONFIGURATION ===
-# Check if API keys are set or prompt user to enter them
-OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", None)
-if not OPENROUTER_API_KEY or OPENROUTER_API_KEY == "YOUR_OPENROUTER_API_KEY":
-    OPENROUTER_API_KEY = input("Enter your OpenRouter API key: ")
-    # Save to environment variable for future use
-    os.environ["OPENROUTER_API_KEY"] = OPENROUTER_API_KEY
+# API keys are passed to the functions that need them (e.g. per Gradio request); when a
+# key isn't given it's read from the environment at that point, so importing this module never blocks
+def _openrouter_api_key(api_key=None):
+    if api_key is None:
+        api_key = os.environ.get("OPENROUTER_API_KEY")
+    if not api_key or api_key == "YOUR_OPENROUTER_API_KEY":
+        raise ValueError("OpenRouter API key is not set. Please set a valid API key.")
+    return api_key
 
 # For Unsplash, we need the Access Key (not the Secret Key)
 # The Access Key is used as the Client-ID in API requests
-UNSPLASH_ACCESS_KEY = os.environ.get("UNSPLASH_ACCESS_KEY", None)
-if not UNSPLASH_ACCESS_KEY or UNSPLASH_ACCESS_KEY == "YOUR_UNSPLASH_API_KEY":
-    print("\nFor Unsplash images, you need to provide your Access Key (not Secret Key)")
-    print("You can find your Access Key at: https://unsplash.com/oauth/applications")
-    UNSPLASH_ACCESS_KEY = input("Enter your Unsplash Access Key: ")
-    # Save to environment variable for future use
-    os.environ["UNSPLASH_ACCESS_KEY"] = UNSPLASH_ACCESS_KEY
+def _unsplash_access_key(access_key=None):
+    if access_key is None:
+        access_key = os.environ.get("UNSPLASH_ACCESS_KEY")
+    if not access_key or access_key == "YOUR_UNSPLASH_API_KEY":
+        return None
+    return access_key
 
-MODEL = "openai/gpt-4o"
+def _ensure_keys():
+    """
+    Prompt for any API key missing from the environment (CLI only)
+    """
+    try:
+        _openrouter_api_key()
+    except ValueError:
+        # Save to environment variable for future use
+        os.environ["OPENROUTER_API_KEY"] = input("Enter your OpenRouter API key: ")
+    
+    if not _unsplash_access_key():
+        print("\nFor Unsplash images, you need to provide your Access Key (not Secret Key)")
+        print("You can find your Access Key at: https://unsplash.com/oauth/applications")
+        # Save to environment variable for future use
+        os.environ["UNSPLASH_ACCESS_KEY"] = input("Enter your Unsplash Access Key: ")
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY,
-)
+# Downloaded images and model responses are cached on disk so repeat runs skip the API round-trips
+CACHE_DIR = os.environ.get("PITCHDECK_CACHE_DIR", os.path.expanduser("~/.cache/pitchdeck"))
+UNSPLASH_CACHE_DIR = os.path.join(CACHE_DIR, "unsplash")
+LLM_CACHE_DIR = os.path.join(CACHE_DIR, "llm")
+
+# Set PITCHDECK_DEBUG to print the raw model output
+DEBUG = bool(os.environ.get("PITCHDECK_DEBUG"))
+
+MODEL = "openai/gpt-4o"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 slide_order = [
     "Problem", "Solution", "Market Analysis", "Competitors",
@@ -43,63 +70,201 @@ slide_order = [
     "Financial Projections", "Team Overview", "Call to Action"
 ]
 
-def get_structured_content(idea):
-    # Check if we have a valid API key
-    if not OPENROUTER_API_KEY or OPENROUTER_API_KEY == "YOUR_OPENROUTER_API_KEY":
-        raise ValueError("OpenRouter API key is not set. Please set a valid API key.")
-    
-    prompt = f"""
-    Generate a JSON object for a startup pitch deck based on the idea: '{idea}'.
-    Include keys: Problem, Solution, Market Analysis, Competitors,
-    Unique Selling Proposition (USP), Business Model, Financial Projections,
-    Team Overview, Call to Action.
-    Make sure the output is strictly valid JSON without any markdown formatting or explanatory text.
-    The response should be a valid JSON object that can be parsed directly.
+SYSTEM_PROMPT = "You are a helpful assistant that responds with valid JSON only. Do not include any explanatory text, markdown formatting, or code blocks in your response."
+
+# Output budget for a single deck; batched requests scale it up to the model's limit
+MAX_TOKENS_PER_DECK = 4096
+MAX_OUTPUT_TOKENS = 16384
+# Larger batches are split into several requests so every deck keeps its full budget
+MAX_DECKS_PER_REQUEST = MAX_OUTPUT_TOKENS // MAX_TOKENS_PER_DECK
+
+# Transient API failures are retried with exponential backoff instead of aborting the deck
+RETRY_ATTEMPTS = 5
+RETRY_MAX_WAIT = 30
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Keep-alive pool for OpenRouter requests made through a shared client
+LLM_MAX_KEEPALIVE = 32
+LLM_MAX_CONNECTIONS = 64
+
+# Cap on concurrent Unsplash requests so the fan-out stays under the rate limit
+UNSPLASH_MAX_CONCURRENCY = 4
+
+# Threads used to decode and re-encode the section images
+IMAGE_WORKERS = 4
+
+# Images are drawn at 4x3 inches, so anything larger only bloats the PDF
+IMAGE_MAX_SIZE = (600, 450)
+IMAGE_QUALITY = 85
+
+def _log_retry(retry_state):
+    print(f"⏳ {retry_state.outcome.exception()} - retrying in {retry_state.next_action.sleep:.0f}s...")
+
+def _is_transient_http_error(exc):
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+_retry_llm = retry(
+    wait=wait_exponential(multiplier=1, max=RETRY_MAX_WAIT),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+_retry_unsplash = retry(
+    wait=wait_exponential(multiplier=1, max=RETRY_MAX_WAIT),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    retry=retry_if_exception(_is_transient_http_error),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+FALLBACK_MESSAGE = "Failed to generate content. Please try again."
+
+def _fallback_content():
+    # Create a basic structure if parsing fails
+    return {section: FALLBACK_MESSAGE for section in slide_order}
+
+def _read_cache_file(path):
+    # Opening directly avoids a separate exists() stat on every lookup
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _write_cache_file(path, data):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    except OSError as e:
+        print(f"⚠️ Could not write cache file {path}: {e}")
+
+def _llm_cache_path(prompt):
+    key = hashlib.sha256(f"{MODEL}|{SYSTEM_PROMPT}|{prompt}".encode()).hexdigest()
+    return os.path.join(LLM_CACHE_DIR, key + ".json")
+
+class _SectionParser:
+    """
+    Incrementally splits a streamed JSON object into its top-level members
+    feed() returns the (key, value) pairs completed by the new text
     """
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member = []
+
+    def feed(self, text):
+        sections = []
+        start = 0
+        for i, char in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    start = i + 1
+            elif char in "}],":
+                # A comma or the closing brace at the top level ends the current member
+                if self._depth == 1:
+                    self._member.append(text[start:i])
+                    member = "".join(self._member).strip()
+                    self._member = []
+                    start = i + 1
+                    if member:
+                        try:
+                            sections.extend(orjson.loads("{" + member + "}").items())
+                        except ValueError:
+                            pass
+                if char != ",":
+                    self._depth -= 1
+        if self._depth >= 1:
+            self._member.append(text[start:])
+        return sections
+
+@_retry_llm
+async def _open_completion_stream(aclient, prompt, max_tokens):
+    return await aclient.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        stream=True,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        top_p=1,
+        presence_penalty=0,
+        frequency_penalty=0,
+        response_format={"type": "json_object"},
+        extra_headers={
+            "HTTP-Referer": "https://pitch-deck-generator.com",
+            "X-Title": "Pitch Deck Generator",
+        }
+    )
 
+async def _complete_json(prompt, max_tokens=MAX_TOKENS_PER_DECK, on_section=None, http_client=None, api_key=None):
+    """
+    Stream a prompt's response from the model and parse it as JSON
+    on_section(name, value) is called for each top-level key as soon as it is complete
+    http_client is an optional shared client from open_llm_http_client(); it is left open
+    api_key is the OpenRouter key to use (default: OPENROUTER_API_KEY from the environment)
+    API errors are converted to ValueError, JSON errors are left to the caller
+    """
+    # Identical prompts reuse the response we already paid for
+    cache_path = _llm_cache_path(prompt)
+    cached_content = _read_cache_file(cache_path)
+    if cached_content is not None:
+        print("♻️ Using cached content for this prompt")
+        result = orjson.loads(cached_content)
+        if on_section and isinstance(result, dict):
+            for name, value in result.items():
+                on_section(name, value)
+        return result
+    
     try:
-        print("🔄 Generating content with GPT-4o...")  
-        res = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that responds with valid JSON only. Do not include any explanatory text, markdown formatting, or code blocks in your response."},
-                {"role": "user", "content": prompt}
-            ],
-            stream=False,
-            max_tokens=4096,
-            temperature=0.7,
-            top_p=1,
-            presence_penalty=0,
-            frequency_penalty=0,
-            response_format={"type": "json_object"},
-            extra_headers={
-                "HTTP-Referer": "https://pitch-deck-generator.com",
-                "X-Title": "Pitch Deck Generator",
-            }
-        )
+        # Retries are handled by tenacity, so the client's own retry loop is disabled
+        # Without a shared client, a client per call keeps its connection pool on the event loop that awaits it
+        aclient = AsyncOpenAI(base_url=OPENROUTER_BASE_URL, api_key=_openrouter_api_key(api_key), max_retries=0, http_client=http_client)
+        try:
+            stream = await _open_completion_stream(aclient, prompt, max_tokens)
+            parser = _SectionParser()
+            chunks = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content or ""
+                chunks.append(text)
+                if on_section:
+                    for name, value in parser.feed(text):
+                        on_section(name, value)
+        finally:
+            # Closing the OpenAI client closes its HTTP client, which a caller's shared client must survive
+            if http_client is None:
+                await aclient.close()
 
-        content = res.choices[0].message.content
-        print("\n--- Raw Model Output ---\n", content)
+        content = "".join(chunks)
+        if DEBUG:
+            print("\n--- Raw Model Output ---\n", content)
         
-        # Parse the JSON
-        structured_content = json.loads(content)
-        print("✅ Content generated successfully!")
-        return structured_content
+        # Parse the JSON and only cache responses that parsed
+        result = orjson.loads(content)
+        _write_cache_file(cache_path, content.encode())
+        return result
     
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse JSON response: {e}")
-        # Create a basic structure if parsing fails
-        return {
-            "Problem": "Failed to generate content. Please try again.",
-            "Solution": "Failed to generate content. Please try again.",
-            "Market Analysis": "Failed to generate content. Please try again.",
-            "Competitors": "Failed to generate content. Please try again.",
-            "Unique Selling Proposition (USP)": "Failed to generate content. Please try again.",
-            "Business Model": "Failed to generate content. Please try again.",
-            "Financial Projections": "Failed to generate content. Please try again.",
-            "Team Overview": "Failed to generate content. Please try again.",
-            "Call to Action": "Failed to generate content. Please try again."
-        }
+    except orjson.JSONDecodeError:
+        raise
     
     except openai.AuthenticationError as e:
         print(f"❌ Authentication error: {e}")
@@ -117,42 +282,158 @@ def get_structured_content(idea):
         print(f"❌ Unexpected error: {e}")
         raise ValueError(f"An unexpected error occurred: {str(e)}. Please try again.")
 
-def fetch_unsplash_image(query):
+def _normalize_idea(idea):
+    """
+    Fold case, whitespace and trailing punctuation so the same idea always builds the same prompt
+    (and hits the LLM cache); any change to the words still makes a different prompt
+    """
+    return " ".join(idea.lower().split()).rstrip(" .!?")
+
+async def get_structured_content_async(idea, on_section=None, http_client=None, api_key=None):
+    # Check if we have a valid API key
+    _openrouter_api_key(api_key)
+    
+    prompt = f"""
+    Generate a JSON object for a startup pitch deck based on the idea: '{_normalize_idea(idea)}'.
+    Include keys: Problem, Solution, Market Analysis, Competitors,
+    Unique Selling Proposition (USP), Business Model, Financial Projections,
+    Team Overview, Call to Action.
+    Make sure the output is strictly valid JSON without any markdown formatting or explanatory text.
+    The response should be a valid JSON object that can be parsed directly.
+    """
+
+    try:
+        print("🔄 Generating content with GPT-4o...")  
+        structured_content = await _complete_json(prompt, on_section=on_section, http_client=http_client, api_key=api_key)
+        print("✅ Content generated successfully!")
+        return structured_content
+    
+    except orjson.JSONDecodeError as e:
+        print(f"❌ Failed to parse JSON response: {e}")
+        return _fallback_content()
+
+async def get_structured_content_batch_async(ideas, on_section=None, http_client=None, api_key=None):
+    """
+    Generate the structured content for several startup ideas with a single request
+    (or one request per MAX_DECKS_PER_REQUEST ideas, run concurrently)
+    Returns a list of structured content dicts in the same order as the ideas
+    Sections are only streamed to on_section when there is a single idea
+    """
+    if len(ideas) == 1:
+        return [await get_structured_content_async(ideas[0], on_section, http_client, api_key)]
+    
+    if len(ideas) > MAX_DECKS_PER_REQUEST:
+        batches = await asyncio.gather(*(
+            get_structured_content_batch_async(ideas[i:i + MAX_DECKS_PER_REQUEST], http_client=http_client, api_key=api_key)
+            for i in range(0, len(ideas), MAX_DECKS_PER_REQUEST)
+        ))
+        return [structured for batch in batches for structured in batch]
+    
+    # Check if we have a valid API key
+    _openrouter_api_key(api_key)
+    
+    enumerated_ideas = "\n    ".join(f"Idea {i}: {_normalize_idea(idea)}" for i, idea in enumerate(ideas, 1))
+    prompt = f"""
+    Generate startup pitch deck content for each of the following ideas:
+    {enumerated_ideas}
+    Respond with a JSON object of the form {{"decks": [...]}} holding one object per idea, in the same order.
+    Each object must include keys: Problem, Solution, Market Analysis, Competitors,
+    Unique Selling Proposition (USP), Business Model, Financial Projections,
+    Team Overview, Call to Action.
+    Make sure the output is strictly valid JSON without any markdown formatting or explanatory text.
+    The response should be a valid JSON object that can be parsed directly.
+    """
+
+    try:
+        print(f"🔄 Generating content for {len(ideas)} ideas with GPT-4o...")
+        result = await _complete_json(
+            prompt,
+            max_tokens=MAX_TOKENS_PER_DECK * len(ideas),
+            http_client=http_client,
+            api_key=api_key,
+        )
+        decks = result.get("decks") if isinstance(result, dict) else None
+        if not isinstance(decks, list):
+            decks = []
+        print("✅ Content generated successfully!")
+    
+    except orjson.JSONDecodeError as e:
+        print(f"❌ Failed to parse JSON response: {e}")
+        decks = []
+    
+    # Fall back to the basic structure for any deck the model left out or mangled
+    return [
+        deck if isinstance(deck, dict) else _fallback_content()
+        for deck in decks[:len(ideas)] + [None] * (len(ideas) - len(decks))
+    ]
+
+def get_structured_content(idea, on_section=None):
+    return asyncio.run(get_structured_content_async(idea, on_section))
+
+def get_structured_content_batch(ideas):
+    return asyncio.run(get_structured_content_batch_async(ideas))
+
+def _image_cache_path(query):
+    return os.path.join(UNSPLASH_CACHE_DIR, hashlib.sha1(query.encode()).hexdigest() + ".jpg")
+
+@_retry_unsplash
+async def _unsplash_get(session, url, **kwargs):
+    """
+    GET a URL and return its status code and body
+    Rate limit and server errors are raised so the request gets retried
+    """
+    async with session.get(url, **kwargs) as response:
+        if response.status in RETRYABLE_STATUS_CODES:
+            response.raise_for_status()
+        return response.status, await response.read()
+
+async def fetch_unsplash_image(session, query, access_key=None):
     # Check if we have a valid API key
-    if not UNSPLASH_ACCESS_KEY or UNSPLASH_ACCESS_KEY == "YOUR_UNSPLASH_API_KEY":
+    access_key = _unsplash_access_key(access_key)
+    if not access_key:
         print(f"⚠️ Unsplash API key not set. Skipping image for '{query}'")
         return None
+    
+    # Reuse the image from a previous run if we already have it
+    cache_path = _image_cache_path(query)
+    cached_image = _read_cache_file(cache_path)
+    if cached_image is not None:
+        return cached_image
         
     # For Unsplash API, we need to use the Access Key as the Client-ID
     # The secret key is only used for server-side OAuth authentication
-    url = f"https://api.unsplash.com/search/photos?query={query}&per_page=1"
+    url = "https://api.unsplash.com/search/photos"
+    params = {"query": query, "per_page": 1}
     headers = {
-        "Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"
+        "Authorization": f"Client-ID {access_key}"
     }
     
     try:
         print(f"🔍 Searching for image related to '{query}'...")
-        response = requests.get(url, headers=headers)
+        status, body = await _unsplash_get(session, url, params=params, headers=headers)
         
         # Check for API errors
-        if response.status_code != 200:
-            print(f"⚠️ Unsplash API error: {response.status_code} - {response.text}")
+        if status != 200:
+            print(f"⚠️ Unsplash API error: {status} - {body.decode(errors='replace')}")
             print("ℹ️ Make sure you're using your Unsplash Access Key, not the Secret key.")
             return None
             
-        data = response.json()
+        data = orjson.loads(body)
         
         if "results" in data and len(data["results"]) > 0:
-            image_url = data["results"][0]["urls"]["regular"]
+            # Let Unsplash resize the image so we only download what the PDF needs
+            raw_url = data["results"][0]["urls"]["raw"]
+            separator = "&" if "?" in raw_url else "?"
+            image_url = f"{raw_url}{separator}w={IMAGE_MAX_SIZE[0]}&q={IMAGE_QUALITY}&fm=jpg"
             print(f"✅ Found image for '{query}', downloading...")
-            image_response = requests.get(image_url)
-            
-            if image_response.status_code == 200:
-                return BytesIO(image_response.content)
+            status, image_bytes = await _unsplash_get(session, image_url)
+            if status == 200:
+                _write_cache_file(cache_path, image_bytes)
+                return image_bytes
         
         print(f"❌ No image found for '{query}' or API limit reached")
         return None
-    except requests.exceptions.RequestException as e:
+    except aiohttp.ClientError as e:
         print(f"❌ Network error fetching image: {e}")
         return None
     except ValueError as e:
@@ -162,8 +443,83 @@ def fetch_unsplash_image(query):
         print(f"❌ Unexpected error fetching image: {e}")
         return None
 
-def create_pdf(structured_content, title):
-    # Define styles for our PDF document
+def open_llm_http_client():
+    """
+    Create an HTTP client for OpenRouter requests
+    Passing the same client to several prepare_decks calls keeps its connections alive between them
+    """
+    return openai.DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_keepalive_connections=LLM_MAX_KEEPALIVE, max_connections=LLM_MAX_CONNECTIONS)
+    )
+
+def open_unsplash_session(max_connections=UNSPLASH_MAX_CONCURRENCY):
+    """
+    Create an HTTP session for Unsplash requests
+    Passing the same session to several fetch_all_images calls keeps its connections alive between them;
+    size max_connections for all the calls that run at once, since each one already limits itself
+    """
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=max_connections))
+
+async def fetch_all_images(sections, session=None, access_key=None):
+    """
+    Fetch the images for all sections concurrently over a single session
+    access_key is the Unsplash key to use (default: UNSPLASH_ACCESS_KEY from the environment)
+    Returns a dict mapping each section to its image bytes (or None)
+    """
+    if session is None:
+        async with open_unsplash_session() as session:
+            return await fetch_all_images(sections, session, access_key)
+    
+    semaphore = asyncio.Semaphore(UNSPLASH_MAX_CONCURRENCY)
+    
+    async def fetch(section):
+        async with semaphore:
+            return await fetch_unsplash_image(session, section, access_key)
+    
+    results = await asyncio.gather(*(fetch(section) for section in sections))
+    return dict(zip(sections, results))
+
+async def prepare_decks(ideas, on_section=None, session=None, http_client=None, openrouter_key=None, unsplash_key=None):
+    """
+    Generate the content for the ideas while the section images download
+    session and http_client are optional shared Unsplash and OpenRouter clients
+    openrouter_key and unsplash_key default to the keys in the environment
+    Returns the list of structured content dicts and the section -> image bytes dict
+    """
+    # The image queries only depend on the section names, so they don't have to wait for the LLM
+    return await asyncio.gather(
+        get_structured_content_batch_async(ideas, on_section, http_client, openrouter_key),
+        fetch_all_images(slide_order, session, unsplash_key),
+    )
+
+def _prepare_image(section, image_data):
+    """
+    Turn downloaded image bytes into a JPEG buffer ReportLab can embed
+    Returns None if there is no image or it can't be processed
+    """
+    if not image_data:
+        return None
+    try:
+        with Image.open(BytesIO(image_data)) as img:
+            # Small JPEGs are embedded as-is, anything else is downscaled and re-encoded in memory
+            if img.format == "JPEG" and img.width <= IMAGE_MAX_SIZE[0] and img.height <= IMAGE_MAX_SIZE[1]:
+                return BytesIO(image_data)
+            img.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+            img_buffer = BytesIO()
+            img.convert("RGB").save(img_buffer, format="JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+            img_buffer.seek(0)
+            return img_buffer
+    except Exception as e:
+        print(f"❌ Error processing image for {section}: {e}")
+        return None
+
+# Shared by every create_pdf call so building several decks doesn't spin up a pool per deck
+_IMAGE_POOL = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="pitchdeck-image")
+
+def _build_styles():
+    """
+    Build the paragraph styles used in the PDF
+    """
     styles = getSampleStyleSheet()
     
     # Create custom styles
@@ -233,52 +589,45 @@ def create_pdf(structured_content, title):
         bulletText='•'
     )
     
-    # Create a safe filename by limiting length and removing invalid characters
-    safe_title = title.lower()
-    # Replace invalid filename characters
-    for char in ['/', '\\', ':', '*', '?', '"', '<', '>', '|']:
-        safe_title = safe_title.replace(char, '-')
-    # Limit length to avoid path too long errors
-    safe_title = safe_title[:50]  # Limit to 50 characters
-    
-    file_name = safe_title.replace(" ", "_") + "_pitch_deck.pdf"
-    
-    # Create the PDF document
-    doc = SimpleDocTemplate(file_name, pagesize=letter)
-    story = []  # This will hold all the elements of our document
-    
+    return {
+        "title": title_style,
+        "subtitle": subtitle_style,
+        "section_title": section_title_style,
+        "normal": normal_style,
+        "highlight": highlight_style,
+        "key": key_style,
+        "bullet": bullet_style,
+    }
+
+# Styles only depend on constants, so build them once instead of on every create_pdf call
+_STYLES = _build_styles()
+
+def iter_flowables(structured_content, title, image_buffers):
+    """
+    Yield the ReportLab flowables for the deck, section by section
+    image_buffers maps each section to its prepared image buffer (or None)
+    """
     # Add title page
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 0.25*inch))
-    story.append(Paragraph("Pitch Deck Generated with GPT-4o (OpenRouter)", subtitle_style))
-    story.append(Spacer(1, 1*inch))
+    yield Paragraph(title, _STYLES["title"])
+    yield Spacer(1, 0.25*inch)
+    yield Paragraph("Pitch Deck Generated with GPT-4o (OpenRouter)", _STYLES["subtitle"])
+    yield Spacer(1, 1*inch)
     
     # Add each section
     for section in slide_order:
         # Add a page break before each section (except the first one)
         if section != slide_order[0]:
-            story.append(Spacer(1, 0.5*inch))
+            yield Spacer(1, 0.5*inch)
         
         # Add section title
-        story.append(Paragraph(section, section_title_style))
-        story.append(Spacer(1, 0.25*inch))
+        yield Paragraph(section, _STYLES["section_title"])
+        yield Spacer(1, 0.25*inch)
         
-        # Try to get an image for this section
-        img_io = fetch_unsplash_image(section)
-        if img_io:
-            # Process the image for PDF
-            try:
-                with Image.open(img_io) as img:
-                    # Save as temporary file
-                    temp_img_path = f"temp_{section.lower().replace(' ', '_')}.jpg"
-                    img.save(temp_img_path, format='JPEG')
-                    
-                    # Add image to the document
-                    img = RLImage(temp_img_path, width=4*inch, height=3*inch)
-                    story.append(img)
-                    story.append(Spacer(1, 0.25*inch))
-            except Exception as e:
-                print(f"❌ Error processing image for {section}: {e}")
+        # Add the image for this section if we have one
+        img_buffer = image_buffers.get(section)
+        if img_buffer:
+            yield RLImage(img_buffer, width=4*inch, height=3*inch)
+            yield Spacer(1, 0.25*inch)
         
         # Handle different JSON structures
         content = structured_content.get(section, "")
@@ -288,84 +637,120 @@ def create_pdf(structured_content, title):
             for i, line in enumerate(content.split(". ")):
                 if line.strip():
                     if i == 0:  # First paragraph is highlighted
-                        story.append(Paragraph(line.strip(), highlight_style))
+                        yield Paragraph(line.strip(), _STYLES["highlight"])
                     else:
-                        story.append(Paragraph(line.strip(), normal_style))
+                        yield Paragraph(line.strip(), _STYLES["normal"])
         
         # If content is a dict, extract values
         elif isinstance(content, dict):
             # Add description if available
             if "Description" in content:
-                story.append(Paragraph(content["Description"], highlight_style))
-                story.append(Spacer(1, 0.1*inch))
+                yield Paragraph(content["Description"], _STYLES["highlight"])
+                yield Spacer(1, 0.1*inch)
             
             # Add other key-value pairs
             for key, value in content.items():
                 if key != "Description":
                     # Handle nested lists
                     if isinstance(value, list):
-                        story.append(Paragraph(f"{key}:", key_style))
+                        yield Paragraph(f"{key}:", _STYLES["key"])
                         
                         for item in value:
-                            story.append(Paragraph(f"• {item}", bullet_style))
+                            yield Paragraph(f"• {item}", _STYLES["bullet"])
                     
                     # Handle nested dicts
                     elif isinstance(value, dict):
-                        story.append(Paragraph(f"{key}:", key_style))
+                        yield Paragraph(f"{key}:", _STYLES["key"])
                         
                         for sub_key, sub_value in value.items():
-                            story.append(Paragraph(f"• <b>{sub_key}:</b> {sub_value}", bullet_style))
+                            yield Paragraph(f"• <b>{sub_key}:</b> {sub_value}", _STYLES["bullet"])
                     
                     # Handle simple values
                     else:
-                        story.append(Paragraph(f"<b>{key}:</b> {value}", normal_style))
+                        yield Paragraph(f"<b>{key}:</b> {value}", _STYLES["normal"])
         
         # If content is a list, add each item as a bullet point
         elif isinstance(content, list):
-            story.append(Paragraph("Key Points:", key_style))
+            yield Paragraph("Key Points:", _STYLES["key"])
             
             for item in content:
-                story.append(Paragraph(f"• {item}", bullet_style))
+                yield Paragraph(f"• {item}", _STYLES["bullet"])
+
+# Invalid filename characters become dashes and spaces become underscores
+_FILENAME_TRANSLATION = str.maketrans({**{char: "-" for char in '/\\:*?"<>|'}, " ": "_"})
+
+def create_pdf(structured_content, title, images=None, output_dir=None):
+    """
+    Build the PDF and save the structured content next to it as JSON
+    Files go to output_dir (default: the current directory); decks built at the same time
+    need separate directories, since titles that share their first 50 characters share file names
+    """
+    # Create a safe filename by replacing invalid characters in a single pass
+    # Limit length to avoid path too long errors
+    safe_title = title.lower().translate(_FILENAME_TRANSLATION)[:50]  # Limit to 50 characters
+    base_path = os.path.join(output_dir or "", safe_title)
+    
+    file_name = base_path + "_pitch_deck.pdf"
+    
+    # Create the PDF document
+    doc = SimpleDocTemplate(file_name, pagesize=letter)
+    
+    # Fetch the images for every section up front so the downloads overlap
+    if images is None:
+        images = asyncio.run(fetch_all_images(slide_order))
+    
+    # Process the images in parallel; PIL releases the GIL while decoding and encoding
+    image_buffers = dict(zip(images, _IMAGE_POOL.map(_prepare_image, images.keys(), images.values())))
     
     # Build the PDF document
-    doc.build(story)
+    doc.build(list(iter_flowables(structured_content, title, image_buffers)))
     print(f"✅ Saved PDF as {file_name}")
     
-    # Clean up temporary image files
-    for section in slide_order:
-        temp_img_path = f"temp_{section.lower().replace(' ', '_')}.jpg"
-        if os.path.exists(temp_img_path):
-            os.remove(temp_img_path)
-    
     # Save JSON
-    json_name = safe_title.replace(" ", "_") + "_pitch_deck.json"
-    with open(json_name, "w") as f:
-        json.dump(structured_content, f, indent=4)
+    json_name = base_path + "_pitch_deck.json"
+    with open(json_name, "wb") as f:
+        f.write(orjson.dumps(structured_content, option=orjson.OPT_INDENT_2))
     print(f"✅ Saved structured content as {json_name}")
     
     # Return the full path to the PDF file
     return os.path.abspath(file_name)
 
-if __name__ == "__main__":
+def main():
     try:
         print("📊 Pitch Deck Generator - PDF Edition 📊")
         print("===========================================\n")
         
-        idea = input("Enter your startup idea: ")
-        if not idea.strip():
+        _ensure_keys()
+        
+        # Several ideas can be passed as arguments to generate their decks in one request
+        ideas = [arg for arg in sys.argv[1:] if arg.strip()]
+        if not ideas:
+            ideas = [input("Enter your startup idea: ")]
+        if not ideas[0].strip():
             print("❌ Error: Please enter a valid startup idea.")
             exit(1)
             
         print("\n🚀 Generating your pitch deck...\n")
         
-        # Generate content
-        structured = get_structured_content(idea)
+        # Generate content while the section images download
+        decks, images = asyncio.run(prepare_decks(ideas, on_section=lambda name, _: print(f"📝 {name} ready")))
         
-        # Create PDF
-        file_path = create_pdf(structured, idea)
+        # Create PDF; with several ideas each deck gets its own folder, since
+        # ideas that share their first 50 characters would otherwise share file names
+        if len(ideas) == 1:
+            output_dirs = [None]
+        else:
+            output_dirs = [f"deck_{i}" for i in range(1, len(ideas) + 1)]
+            for output_dir in output_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+        file_paths = [
+            create_pdf(structured, idea, images, output_dir)
+            for idea, structured, output_dir in zip(ideas, decks, output_dirs)
+        ]
         
         print("\n✨ All done! Your pitch deck has been created successfully.")
-        print(f"📄 You can find your PDF at: {file_path}")
+        for file_path in file_paths:
+            print(f"📄 You can find your PDF at: {file_path}")
         
     except ValueError as e:
         print(f"\n❌ Error: {str(e)}")
@@ -376,4 +761,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ An unexpected error occurred: {str(e)}")
         print("Please try again or report this issue.")
-        exit(1)
\ No newline at end of file
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,64 @@
 import gradio as gr
+import asyncio
 import os
+import shutil
 import tempfile
+from collections import deque
 from datetime import datetime
-from generate_pitch_deck_ppt import get_structured_content, create_pdf
+from generate_pitch_deck_ppt import prepare_decks, create_pdf, CACHE_DIR
 
-# Initialize API keys from environment variables (will be overridden by UI inputs)
+# API keys from the environment, used when a request leaves the UI fields empty
+# Requests run concurrently, so a user's keys are passed along with their request, never stored globally
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
 UNSPLASH_ACCESS_KEY = os.environ.get("UNSPLASH_ACCESS_KEY", "")
 
-def generate_pitch_deck(idea, openrouter_key, unsplash_key, progress=gr.Progress()):
+# Number of decks the server generates at the same time
+MAX_CONCURRENT_DECKS = 4
+
+# Every deck is built in its own folder under PDF_DIR; only the most recent ones are kept
+PDF_DIR = os.path.join(CACHE_DIR, "pdfs-basic")
+MAX_KEPT_DECKS = 64
+_BUILD_DIRS = deque()
+
+def _new_build_dir():
+    """
+    Create the folder a PDF is built in, so concurrent builds of similar titles can't overwrite each other
+    The oldest folders are deleted once there are more than MAX_KEPT_DECKS
+    """
+    os.makedirs(PDF_DIR, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=PDF_DIR)
+    _BUILD_DIRS.append(build_dir)
+    while len(_BUILD_DIRS) > MAX_KEPT_DECKS:
+        shutil.rmtree(_BUILD_DIRS.popleft(), ignore_errors=True)
+    return build_dir
+
+async def generate_pitch_deck(idea, openrouter_key, unsplash_key, progress=gr.Progress()):
     """
     Wrapper function for the pitch deck generator that works with Gradio
     Returns the path to the generated PDF and JSON files
     """
     try:
-        # Update API keys from UI inputs
-        if openrouter_key:
-            os.environ["OPENROUTER_API_KEY"] = openrouter_key
-        if unsplash_key:
-            os.environ["UNSPLASH_ACCESS_KEY"] = unsplash_key
+        # Use the keys from the UI, falling back to the ones the server was started with
+        openrouter_key = openrouter_key or OPENROUTER_API_KEY
+        unsplash_key = unsplash_key or UNSPLASH_ACCESS_KEY
             
         # Validate we have required API keys
-        if not os.environ.get("OPENROUTER_API_KEY"):
+        if not openrouter_key:
             raise ValueError("OpenRouter API key is required")
         
         progress(0.1, "Initializing...")
             
-        # Generate structured content
+        # Generate structured content while the section images download
         progress(0.2, "Generating content with GPT-4o...")
-        structured = get_structured_content(idea)
+        (structured,), images = await prepare_decks([idea], openrouter_key=openrouter_key, unsplash_key=unsplash_key)
         
         progress(0.6, "Creating PDF presentation...")
-        # Create PDF
-        pdf_path = create_pdf(structured, idea)
+        # Create PDF in a worker thread so the event loop keeps serving other users
+        loop = asyncio.get_running_loop()
+        pdf_path = await loop.run_in_executor(None, create_pdf, structured, idea, images, _new_build_dir())
         
         # Get the corresponding JSON path
-        json_path = pdf_path.replace(".pdf", ".json")
+        json_path = os.path.splitext(pdf_path)[0] + ".json"
         
         progress(1.0, "Complete!")
         return pdf_path, json_path, f"✅ Successfully generated pitch deck for: '{idea}'"
@@ -46,6 +69,9 @@ def main():
     """
     Create and launch the Gradio interface with improved design
     """
+    # Folders built by a previous run aren't tracked, so start from an empty one
+    shutil.rmtree(PDF_DIR, ignore_errors=True)
+    
     # Custom CSS for better styling
     custom_css = """
     .gradio-container {
@@ -224,11 +250,12 @@ def main():
         submit_btn.click(
             fn=generate_pitch_deck,
             inputs=[idea_input, openrouter_key, unsplash_key],
-            outputs=[pdf_output, json_output, status]
+            outputs=[pdf_output, json_output, status],
+            concurrency_limit=MAX_CONCURRENT_DECKS
         )
     
     # Launch with a larger default height
-    demo.launch(height=800)
+    demo.launch(height=800, allowed_paths=[PDF_DIR])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
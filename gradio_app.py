@@ -1,49 +1,246 @@
-import gradio as gr
+import asyncio
+import hashlib
 import os
+import re
+import shutil
 import tempfile
-import json
-from generate_pitch_deck_ppt import get_structured_content, create_pdf
+import orjson
+import threading
+from collections import OrderedDict
+from itertools import islice
+from generate_pitch_deck_ppt import (
+    prepare_decks, create_pdf, open_llm_http_client, open_unsplash_session,
+    slide_order, CACHE_DIR, UNSPLASH_MAX_CONCURRENCY,
+)
 
-# Initialize API keys from environment variables (will be overridden by UI inputs)
+# API keys from the environment, used when a request leaves the UI fields empty
+# Requests run concurrently, so a user's keys are passed along with their request, never stored globally
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
 UNSPLASH_ACCESS_KEY = os.environ.get("UNSPLASH_ACCESS_KEY", "")
 
-def generate_pitch_deck(idea, openrouter_key, unsplash_key, progress=gr.Progress()):
+# Number of requests the server handles at the same time
+MAX_CONCURRENT_DECKS = 4
+
+# Example ideas shown under the input; their decks are generated in the background at startup
+# when both API keys are set in the environment
+EXAMPLES = [
+    "An AI-powered platform that helps small businesses optimize their social media marketing strategies with minimal effort.",
+    "A mobile app that uses gamification to teach financial literacy and investment basics to teenagers through fun challenges.",
+    "A SaaS platform that automates inventory management for e-commerce businesses using predictive analytics and machine learning.",
+    "A sustainable food delivery service that connects local farmers directly with urban consumers to reduce food waste."
+]
+
+# Recently built PDFs keyed by their content and title, so identical requests skip the PDF work
+# Every build gets its own folder under PDF_DIR, which is deleted when the build is evicted
+PDF_DIR = os.path.join(CACHE_DIR, "pdfs")
+MAX_CACHED_PDFS = 64
+_PDF_CACHE = OrderedDict()  # key -> (pdf_path, modification time when it was built)
+_PDF_CACHE_LOCK = threading.Lock()
+
+# HTTP clients shared by all requests so connections (and their TLS sessions) are reused
+# They are bound to the event loop that creates them, so each loop (the server's, the prewarm thread's) gets its own
+# and must be closed on that loop with _aclose_http_clients()
+_HTTP_CLIENTS = {}  # event loop -> (Unsplash session, OpenRouter client)
+
+def _http_clients():
+    """
+    Return the shared Unsplash session and OpenRouter client for the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    # Forget clients of loops that finished without closing them (e.g. asyncio.run callers)
+    for closed_loop in [other for other in _HTTP_CLIENTS if other.is_closed()]:
+        del _HTTP_CLIENTS[closed_loop]
+    clients = _HTTP_CLIENTS.get(loop)
+    if clients is None:
+        # Every concurrent request gets its full share of Unsplash connections
+        session = open_unsplash_session(MAX_CONCURRENT_DECKS * UNSPLASH_MAX_CONCURRENCY)
+        clients = _HTTP_CLIENTS[loop] = (session, open_llm_http_client())
+    return clients
+
+async def _aclose_http_clients():
+    """
+    Close the running event loop's shared clients
+    """
+    clients = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if clients is not None:
+        session, http_client = clients
+        await session.close()
+        await http_client.aclose()
+
+def _pdf_cache_key(structured, idea):
+    content = orjson.dumps(structured, option=orjson.OPT_SORT_KEYS) + idea.encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def _cached_pdf(key):
+    """
+    Return the path of the PDF built for this key if it is still on disk unchanged
+    """
+    with _PDF_CACHE_LOCK:
+        entry = _PDF_CACHE.get(key)
+        if entry is None:
+            return None
+        pdf_path, mtime = entry
+        try:
+            # The file may have been removed or replaced since it was built
+            if os.stat(pdf_path).st_mtime_ns == mtime:
+                _PDF_CACHE.move_to_end(key)
+                return pdf_path
+        except FileNotFoundError:
+            pass
+        del _PDF_CACHE[key]
+    shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+    return None
+
+def _new_build_dir():
+    """
+    Create the folder a PDF is built in, so concurrent builds of similar titles can't overwrite each other
+    """
+    os.makedirs(PDF_DIR, exist_ok=True)
+    return tempfile.mkdtemp(dir=PDF_DIR)
+
+def _remember_pdf(key, pdf_path):
+    """
+    Track a PDF built in a _new_build_dir() folder, reusing it for key unless key is None
+    Folders of PDFs evicted from the cache are deleted
+    """
+    with _PDF_CACHE_LOCK:
+        if key is None or key in _PDF_CACHE:
+            # Only tracked so its folder gets cleaned up; the path never matches a lookup key
+            # (an existing entry for the key may still be on its way to another user)
+            key = pdf_path
+        _PDF_CACHE[key] = (pdf_path, os.stat(pdf_path).st_mtime_ns)
+        evicted = []
+        while len(_PDF_CACHE) > MAX_CACHED_PDFS:
+            evicted.append(_PDF_CACHE.popitem(last=False)[1][0])
+    for evicted_path in evicted:
+        shutil.rmtree(os.path.dirname(evicted_path), ignore_errors=True)
+
+def _no_progress(*args, **kwargs):
+    pass
+
+async def generate_pitch_deck(idea, openrouter_key, unsplash_key, progress=_no_progress):
     """
     Wrapper function for the pitch deck generator that works with Gradio
-    Returns the path to the generated PDF and JSON files
+    Yields partial previews while the content streams in, then the paths to
+    the generated PDF and JSON files (one pair per idea)
+    progress(fraction, description) is called as the work advances
     """
+    task = None
     try:
-        # Update API keys from UI inputs
-        if openrouter_key:
-            os.environ["OPENROUTER_API_KEY"] = openrouter_key
-        if unsplash_key:
-            os.environ["UNSPLASH_ACCESS_KEY"] = unsplash_key
+        # Use the keys from the UI, falling back to the ones the server was started with
+        openrouter_key = openrouter_key or OPENROUTER_API_KEY
+        unsplash_key = unsplash_key or UNSPLASH_ACCESS_KEY
             
         # Validate we have required API keys
-        if not os.environ.get("OPENROUTER_API_KEY"):
+        if not openrouter_key:
             raise ValueError("OpenRouter API key is required")
         
         progress(0.1, "Initializing...")
-            
-        # Generate structured content
+        
+        # Each non-empty line is treated as a separate idea so several decks share one request
+        ideas = [line.strip() for line in idea.splitlines() if line.strip()] or [idea]
+        
+        # Generate structured content while the section images download
+        # Ideas we've seen before (up to case and spacing) are answered from the LLM cache
         progress(0.2, "Generating content with GPT-4o...")
-        structured = get_structured_content(idea)
+        # Sections are only streamed for a single idea; None marks the end of the stream
+        streamed = asyncio.Queue()
+        def on_section(name, value):
+            streamed.put_nowait((name, value))
+        session, http_client = _http_clients()
+        task = asyncio.ensure_future(prepare_decks(ideas, on_section, session, http_client, openrouter_key, unsplash_key))
+        task.add_done_callback(lambda _: streamed.put_nowait(None))
+        
+        # Show each section in the preview as soon as the model finishes it
+        partial = {}
+        while (item := await streamed.get()) is not None:
+            name, value = item
+            partial[name] = value
+            progress(0.2 + 0.4 * min(len(partial) / len(slide_order), 1), f"Generated {name}...")
+            yield None, None, create_content_preview(partial, ideas[0]), f"⏳ Generated {name}..."
+        decks, images = await task
         
+        # The text is ready, so show it while the images and PDFs are still being prepared
         progress(0.6, "Creating PDF presentation...")
-        # Create PDF
-        pdf_path = create_pdf(structured, idea)
+        previews = [create_content_preview(structured, deck_idea) for deck_idea, structured in zip(ideas, decks)]
+        yield None, None, "".join(previews), "⏳ Creating PDF presentation..."
+        
+        # Identical content for the same idea reuses the PDF we already built
+        pdf_keys = [_pdf_cache_key(structured, deck_idea) for deck_idea, structured in zip(ideas, decks)]
+        pdf_paths = [_cached_pdf(key) for key in pdf_keys]
+        missing = [i for i, pdf_path in enumerate(pdf_paths) if pdf_path is None]
         
-        # Get the corresponding JSON path
-        json_path = pdf_path.replace(".pdf", ".json")
+        # Create the PDFs in worker threads so the event loop keeps serving other users
+        loop = asyncio.get_running_loop()
+        built_paths = await asyncio.gather(*(
+            loop.run_in_executor(None, create_pdf, decks[i], ideas[i], images, _new_build_dir())
+            for i in missing
+        ))
+        # A deck missing images (no Unsplash key, a failed download) isn't reused, so it's rebuilt once they're available
+        complete = all(image is not None for image in images.values())
+        for i, pdf_path in zip(missing, built_paths):
+            pdf_paths[i] = pdf_path
+            _remember_pdf(pdf_keys[i] if complete else None, pdf_path)
         
-        # Create a simple preview by extracting a few sections from the structured content
-        preview_html = create_content_preview(structured, idea)
+        # Get the corresponding JSON paths
+        json_paths = [os.path.splitext(pdf_path)[0] + ".json" for pdf_path in pdf_paths]
+        
+        if len(ideas) == 1:
+            message = f"✅ Successfully generated pitch deck for: '{ideas[0]}'"
+        else:
+            message = f"✅ Successfully generated {len(ideas)} pitch decks"
         
         progress(1.0, "Complete!")
-        return pdf_path, json_path, preview_html, f"✅ Successfully generated pitch deck for: '{idea}'"
+        yield pdf_paths, json_paths, "".join(previews), message
+    except Exception as e:
+        yield None, None, "<div class='error-preview'>Error generating content</div>", f"❌ Error: {str(e)}"
+    finally:
+        # Stop generating if the user went away before the content was ready
+        if task is not None and not task.done():
+            task.cancel()
+
+def _prewarm(examples, openrouter_key, unsplash_key):
+    """
+    Generate the decks for the example ideas so the first click on one is served from the caches
+    The server's own keys are passed in, so the work is never billed to a visitor's key
+    """
+    async def run():
+        try:
+            for idea in examples:
+                outputs = None
+                async for outputs in generate_pitch_deck(idea, openrouter_key, unsplash_key):
+                    pass
+                print(f"♻️ Prewarm: {outputs[-1]}")
+        finally:
+            await _aclose_http_clients()
+    
+    try:
+        asyncio.run(run())
     except Exception as e:
-        return None, None, "<div class='error-preview'>Error generating content</div>", f"❌ Error: {str(e)}"
+        print(f"⚠️ Could not prewarm the examples: {e}")
+
+# Escapes HTML special characters in one pass over the string
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})
+
+def escape_html(value):
+    """
+    Escape user or model supplied text before embedding it in the preview HTML
+    """
+    return str(value).translate(_HTML_ESCAPES)
+
+# Bounds on the preview so a runaway model response can't flood the page
+MAX_PREVIEW_SENTENCES = 5
+MAX_PREVIEW_CHARS = 4096
+
+# Sentence boundaries: whitespace after a full stop, question mark or exclamation mark
+# that starts a new sentence, so abbreviations like "e.g. this" stay in one piece
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+
+# Fixed parts of the preview HTML
+_PREVIEW_OPEN = "<div class='content-preview'>"
+_PREVIEW_TITLE = "<div class='preview-title'>{}</div>".format
+_SECTION_HDR = "<div class='preview-section'><div class='section-title'>{}</div>".format
+_PREVIEW_FOOTER = "<div class='preview-footer'>Download the PDF to view the complete presentation with images</div></div>"
 
 def create_content_preview(structured_content, idea):
     """
@@ -53,76 +250,90 @@ def create_content_preview(structured_content, idea):
         # Create a preview of up to 3 sections
         sections_to_preview = ["Problem", "Solution", "Market Analysis"]
         
-        html = "<div class='content-preview'>"
-        html += f"<div class='preview-title'>{idea}</div>"
+        # At most MAX_PREVIEW_CHARS characters of text (before escaping) are shown,
+        # each fragment is cut to what's left of that budget
+        remaining = MAX_PREVIEW_CHARS
+        truncated = False
+        def text(value):
+            nonlocal remaining, truncated
+            shown = str(value)[:remaining]
+            truncated = truncated or len(shown) < len(str(value))
+            remaining -= len(shown)
+            return escape_html(shown)
+        
+        # Collect the HTML fragments and join them once at the end
+        parts = [_PREVIEW_OPEN, _PREVIEW_TITLE(text(idea))]
         
-        # Add each section
+        # Add each section until the text budget runs out
         for section in sections_to_preview:
+            if remaining <= 0:
+                truncated = True
+                break
             if section in structured_content:
-                html += f"<div class='preview-section'>"
-                html += f"<div class='section-title'>{section}</div>"
+                parts.append(_SECTION_HDR(section))
                 
                 content = structured_content.get(section, "")
                 
                 # Handle different content types
                 if isinstance(content, str):
-                    # Split by periods for better readability
-                    paragraphs = content.split(". ")
-                    for para in paragraphs:
-                        if para.strip():
-                            html += f"<p>{para.strip()}</p>"
+                    # Split into sentences for better readability, stopping once we have enough
+                    # (a piece past MAX_PREVIEW_SENTENCES means sentences were left out)
+                    paragraphs = _SENT_SPLIT.split(content[:remaining].strip(), MAX_PREVIEW_SENTENCES)
+                    truncated = truncated or len(content) > remaining or len(paragraphs) > MAX_PREVIEW_SENTENCES
+                    parts.extend(f"<p>{text(para)}</p>" for para in paragraphs[:MAX_PREVIEW_SENTENCES] if para)
                 
                 elif isinstance(content, dict):
                     # Add description if available
                     if "Description" in content:
-                        html += f"<p class='highlight'>{content['Description']}</p>"
+                        parts.append(f"<p class='highlight'>{text(content['Description'])}</p>")
                     
                     # Add other key-value pairs
                     for key, value in content.items():
+                        if remaining <= 0:
+                            truncated = True
+                            break
                         if key != "Description":
                             if isinstance(value, list):
-                                html += f"<div class='key-label'>{key}:</div>"
-                                html += "<ul>"
-                                for item in value[:3]:  # Limit to first 3 items
-                                    html += f"<li>{item}</li>"
-                                if len(value) > 3:
-                                    html += "<li>...</li>"
-                                html += "</ul>"
+                                parts.extend([
+                                    f"<div class='key-label'>{text(key)}:</div>",
+                                    "<ul>",
+                                    *(f"<li>{text(item)}</li>" for item in value[:3]),  # Limit to first 3 items
+                                    "<li>...</li>" if len(value) > 3 else "",
+                                    "</ul>",
+                                ])
                             elif isinstance(value, dict):
-                                html += f"<div class='key-label'>{key}:</div>"
-                                html += "<ul>"
-                                for sub_key, sub_value in list(value.items())[:3]:  # Limit to first 3 items
-                                    html += f"<li><b>{sub_key}:</b> {sub_value}</li>"
-                                if len(value) > 3:
-                                    html += "<li>...</li>"
-                                html += "</ul>"
+                                parts.extend([
+                                    f"<div class='key-label'>{text(key)}:</div>",
+                                    "<ul>",
+                                    *(f"<li><b>{text(sub_key)}:</b> {text(sub_value)}</li>" for sub_key, sub_value in islice(value.items(), 3)),  # Limit to first 3 items
+                                    "<li>...</li>" if len(value) > 3 else "",
+                                    "</ul>",
+                                ])
                             else:
-                                html += f"<p><b>{key}:</b> {value}</p>"
+                                parts.append(f"<p><b>{text(key)}:</b> {text(value)}</p>")
                 
                 elif isinstance(content, list):
-                    html += "<ul>"
-                    for item in content[:5]:  # Limit to first 5 items
-                        html += f"<li>{item}</li>"
-                    if len(content) > 5:
-                        html += "<li>...</li>"
-                    html += "</ul>"
+                    parts.extend([
+                        "<ul>",
+                        *(f"<li>{text(item)}</li>" for item in content[:5]),  # Limit to first 5 items
+                        "<li>...</li>" if len(content) > 5 else "",
+                        "</ul>",
+                    ])
                 
-                html += "</div>"  # Close section
+                parts.append("</div>")  # Close section
         
-        html += "<div class='preview-footer'>Download the PDF to view the complete presentation with images</div>"
-        html += "</div>"  # Close preview
+        # Mark that the text was cut short
+        if truncated:
+            parts.append("<p>…</p>")
+        parts.append(_PREVIEW_FOOTER)  # Also closes the preview
         
-        return html
+        return "".join(parts)
     except Exception as e:
         print(f"Error creating content preview: {e}")
-        return f"<div class='error-preview'>Error creating content preview: {str(e)}</div>"
+        return f"<div class='error-preview'>Error creating content preview: {escape_html(e)}</div>"
 
-def main():
-    """
-    Create and launch the Gradio interface with improved design
-    """
-    # Custom CSS for better styling with enhanced colors
-    custom_css = """
+# Custom CSS for better styling with enhanced colors
+_CUSTOM_CSS = """
     body {
         background-color: #F3F4F6;
     }
@@ -297,9 +508,24 @@ def main():
     button.primary:hover {
         background-color: #4F46E5 !important;
     }
+"""
+
+def main():
+    """
+    Create and launch the Gradio interface with improved design
     """
+    # Imported here so using generate_pitch_deck programmatically doesn't load Gradio
+    import gradio as gr
     
-    with gr.Blocks(title="AI Pitch Deck Generator", theme=gr.themes.Soft(), css=custom_css) as demo:
+    # Folders built by a previous run aren't tracked by the PDF cache, so start from an empty one
+    shutil.rmtree(PDF_DIR, ignore_errors=True)
+    
+    # Gradio only tracks progress for handlers whose signature defaults to gr.Progress()
+    async def generate(idea, openrouter_key, unsplash_key, progress=gr.Progress()):
+        async for outputs in generate_pitch_deck(idea, openrouter_key, unsplash_key, progress):
+            yield outputs
+    
+    with gr.Blocks(title="AI Pitch Deck Generator", theme=gr.themes.Soft(), css=_CUSTOM_CSS) as demo:
         gr.Markdown("# 🚀 AI-Powered Pitch Deck Generator")
         gr.Markdown("## Transform your startup idea into a professional pitch deck in seconds using GPT-4o")
         
@@ -333,7 +559,7 @@ def main():
                     gr.Markdown("### Your Startup Idea")
                     idea_input = gr.Textbox(
                         label="",
-                        placeholder="Describe your startup idea in 1-2 sentences...",
+                        placeholder="Describe your startup idea in 1-2 sentences (one idea per line for several decks)...",
                         lines=4,
                         elem_id="idea-input"
                     )
@@ -361,12 +587,7 @@ def main():
                     # Examples
                     gr.Markdown("### Example Ideas")
                     examples = gr.Examples(
-                        examples=[
-                            "An AI-powered platform that helps small businesses optimize their social media marketing strategies with minimal effort.",
-                            "A mobile app that uses gamification to teach financial literacy and investment basics to teenagers through fun challenges.",
-                            "A SaaS platform that automates inventory management for e-commerce businesses using predictive analytics and machine learning.",
-                            "A sustainable food delivery service that connects local farmers directly with urban consumers to reduce food waste."
-                        ],
+                        examples=EXAMPLES,
                         inputs=[idea_input],
                         label=""
                     )
@@ -391,8 +612,8 @@ def main():
                     
                     # Outputs
                     with gr.Row():
-                        pdf_output = gr.File(label="Download PDF Presentation")
-                        json_output = gr.File(label="Download JSON Content")
+                        pdf_output = gr.File(label="Download PDF Presentation", file_count="multiple")
+                        json_output = gr.File(label="Download JSON Content", file_count="multiple")
                     
                     # Information box
                     with gr.Accordion("About This Tool", open=False):
@@ -424,13 +645,20 @@ def main():
                 
         # Set up button click handler with all inputs
         submit_btn.click(
-            fn=generate_pitch_deck,
+            fn=generate,
             inputs=[idea_input, openrouter_key, unsplash_key],
-            outputs=[pdf_output, json_output, preview, status]
+            outputs=[pdf_output, json_output, preview, status],
+            concurrency_limit=MAX_CONCURRENT_DECKS,
+            api_name="generate_pitch_deck"
         )
     
-    # Launch with a larger default height
-    demo.launch(height=800)
+    # Build the example decks in the background (they need the API keys from the environment)
+    # Without an Unsplash key the decks would have no images and couldn't be reused, so skip it
+    if OPENROUTER_API_KEY and UNSPLASH_ACCESS_KEY:
+        threading.Thread(target=_prewarm, args=(EXAMPLES, OPENROUTER_API_KEY, UNSPLASH_ACCESS_KEY), daemon=True).start()
+    
+    # Launch with a larger default height; the PDFs live outside the working and temp directories
+    demo.launch(height=800, allowed_paths=[PDF_DIR])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file